@@ -2,8 +2,14 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Input, Output, dash_table
-from collections import Counter
+from scipy import sparse
+from dash import Dash, dcc, html, Input, Output, State, ctx, dash_table
+from flask import jsonify
+from collections import Counter, defaultdict
+from functools import wraps
+import threading
+import copy
+import os
 import re
 
 # Function to extract all skills from a column
@@ -14,6 +20,246 @@ def extract_all_skills(series):
         all_skills.extend([skill.strip() for skill in skills])
     return all_skills
 
+# Function to build a sparse respondent x skill matrix (1 if the respondent asked for the skill)
+def build_skill_matrix(series):
+    series = series.reset_index(drop=True)
+    skills = series.str.split(r',\s*|;\s*').explode().dropna().str.strip()
+    skills = skills[skills != '']
+    codes, skill_names = pd.factorize(skills, sort=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (skills.index.to_numpy(), codes)),
+        shape=(len(series), len(skill_names))
+    )
+    # Count each skill once per respondent
+    matrix.data[:] = 1
+    return matrix, np.asarray(skill_names)
+
+# Survey columns the filters and the skill type selector refer to
+filter_columns = {
+    'region': 'Your Settlement/Location (Zone Wise)',
+    'gender': 'Gender',
+    'age_group': 'Age Group'
+}
+skill_columns = {
+    'technical': 'Which Skill would you like to learn?',
+    'soft': 'Which Soft Skill Would You like to learn?',
+    'all': 'Training Needs'
+}
+
+# Class to run the dashboard's queries on a survey DataFrame held in memory
+# (same methods as storage.SurveyStore, which runs them on SQLite)
+class DataFrameStore:
+    def __init__(self, df):
+        self.df = df
+        # Sparse respondent x skill matrix for co-occurrence analysis
+        self.skill_matrix, self.skill_matrix_names = build_skill_matrix(df['Training Needs'])
+    
+    # Function to get the rows matching the region, gender and age group filters ('all' means no filter)
+    def mask(self, filters):
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, label in filter_columns.items():
+            value = filters.get(column, 'all')
+            if value != 'all':
+                mask &= self.df[label].to_numpy() == value
+        return mask
+    
+    def filtered(self, filters):
+        return self.df[self.mask(filters)]
+    
+    # Function to get the column of the selected skill type (anything else means all skills)
+    def skill_column(self, skill_type):
+        return skill_columns.get(skill_type, skill_columns['all'])
+    
+    def distinct(self, column):
+        return self.df[filter_columns[column]].dropna().unique()
+    
+    def distinct_skills(self, skill_type):
+        return list(set(extract_all_skills(self.df[self.skill_column(skill_type)])))
+    
+    def count_respondents(self, filters):
+        return int(np.count_nonzero(self.mask(filters)))
+    
+    # Respondents per value of a column
+    def count_by(self, column, filters):
+        return self.filtered(filters)[filter_columns[column]].value_counts()
+    
+    # Most requested skills (ties in order of first mention)
+    def top_skills(self, skill_type, filters, limit):
+        skills = extract_all_skills(self.filtered(filters)[self.skill_column(skill_type)])
+        return pd.DataFrame(Counter(skills).most_common(limit), columns=['Skill', 'Count'])
+    
+    # Mentions of one skill and respondents per region
+    def skill_count_by_region(self, skill, filters):
+        filtered_df = self.filtered(filters)
+        region_data = []
+        
+        for region in self.distinct('region'):
+            region_df = filtered_df[filtered_df[filter_columns['region']] == region]
+            region_total = len(region_df)
+            
+            if region_total > 0:
+                region_skills = extract_all_skills(region_df['Training Needs'])
+                skill_count = sum(1 for item in region_skills if item == skill)
+                region_data.append((region, skill_count, region_total))
+        
+        return pd.DataFrame(region_data, columns=['Region', 'Count', 'Total Respondents'])
+    
+    # Top skills per region for regions with at least min_respondents respondents
+    def top_skills_by_region(self, skill_type, filters, limit, min_respondents):
+        filtered_df = self.filtered(filters)
+        chart_data = []
+        
+        for region in self.distinct('region'):
+            region_df = filtered_df[filtered_df[filter_columns['region']] == region]
+            region_total = len(region_df)
+            
+            if region_total == 0 or region_total < min_respondents:
+                continue
+            
+            region_skills = extract_all_skills(region_df[self.skill_column(skill_type)])
+            for skill, count in Counter(region_skills).most_common(limit):
+                chart_data.append((region, skill, count, region_total))
+        
+        return pd.DataFrame(chart_data, columns=['Region', 'Skill', 'Count', 'Total Respondents'])
+    
+    # Skill mention counts per gender, with the first mention for stable ordering
+    def skill_counts_by_gender(self, skill_type, filters):
+        filtered_df = self.filtered(filters)
+        counts = []
+        
+        for gender in ('Male', 'Female'):
+            gender_df = filtered_df[filtered_df['Gender'] == gender]
+            skills = extract_all_skills(gender_df[self.skill_column(skill_type)])
+            first_seen = {}
+            for position, skill in enumerate(skills):
+                first_seen.setdefault(skill, position)
+            counts.extend((gender, skill, count, first_seen[skill]) for skill, count in Counter(skills).items())
+        
+        return pd.DataFrame(counts, columns=['Gender', 'Skill', 'Count', 'first_seen'])
+    
+    # Skill x skill co-occurrence counts of 'Training Needs' for the filtered respondents
+    def skill_cooccurrence(self, filters):
+        filtered_matrix = self.skill_matrix[np.flatnonzero(self.mask(filters))]
+        cooccurrence = (filtered_matrix.T @ filtered_matrix).tocsr()
+        respondents = np.count_nonzero(filtered_matrix.getnnz(axis=1))
+        return cooccurrence, respondents, self.skill_matrix_names
+    
+    # Trainee records plus the total number of matching trainees
+    def trainees(self, filters, skill, offset=0, limit=None):
+        filtered_df = self.filtered(filters)
+        
+        # Filter by selected skill if applicable
+        if skill:
+            # We need to find trainees who have the selected skill in their training needs
+            skill_matches = []
+            
+            for idx, row in filtered_df.iterrows():
+                training_needs = row['Training Needs']
+                if pd.isna(training_needs):
+                    continue
+                
+                skills = [item.strip() for item in re.split(r',\s*|;\s*', training_needs)]
+                if skill in skills:
+                    skill_matches.append(idx)
+            
+            filtered_df = filtered_df.loc[skill_matches] if skill_matches else pd.DataFrame(columns=filtered_df.columns)
+        
+        end = None if limit is None else offset + limit
+        return filtered_df.iloc[offset:end], len(filtered_df)
+
+# Single-flight request coalescing: concurrent calls to the same callback with
+# the same inputs wait on one in-flight computation and share its result.
+# Coalescing is per process, so each gunicorn worker keeps its own table.
+single_flight_lock = threading.Lock()
+single_flight_calls = {}
+single_flight_stats = defaultdict(Counter)
+
+# Function to turn callback inputs into a hashable key
+def normalize_inputs(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_inputs(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize_inputs(item)) for key, item in value.items()))
+    return value
+
+# Function to give a follower its own copy of the leader's error, chained from it,
+# so concurrent raises don't share (and tangle) one traceback. Dash relies on
+# the exception type (e.g. PreventUpdate), so the type is kept where possible.
+def coalesced_error(name, error):
+    copied = None
+    if isinstance(error, Exception):
+        try:
+            copied = copy.copy(error)
+        except Exception:
+            copied = None
+    if not isinstance(copied, BaseException) or copied is error:
+        copied = RuntimeError(f"Coalesced call to {name} failed: {error!r}")
+    copied.__traceback__ = None
+    return copied
+
+# Decorator to coalesce concurrent identical calls of a callback
+def single_flight(func):
+    @wraps(func)
+    def wrapper(*args):
+        key = (func.__name__, normalize_inputs(args))
+        
+        with single_flight_lock:
+            stats = single_flight_stats[func.__name__]
+            stats['requests'] += 1
+            call = single_flight_calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = {'done': threading.Event(), 'result': None, 'error': None}
+                single_flight_calls[key] = call
+                stats['computed'] += 1
+            else:
+                stats['coalesced'] += 1
+        
+        # Followers wait for the leader and share its result (or its error)
+        if not is_leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise coalesced_error(func.__name__, call['error']) from call['error']
+            return call['result']
+        
+        try:
+            call['result'] = func(*args)
+        except BaseException as error:
+            call['error'] = error
+            raise
+        finally:
+            with single_flight_lock:
+                del single_flight_calls[key]
+            call['done'].set()
+        
+        return call['result']
+    
+    return wrapper
+
+# Function to get a snapshot of the single-flight counters
+def get_single_flight_stats():
+    with single_flight_lock:
+        callbacks = {
+            name: {counter: stats[counter] for counter in ('requests', 'computed', 'coalesced')}
+            for name, stats in single_flight_stats.items()
+        }
+    
+    totals = Counter()
+    for stats in callbacks.values():
+        totals.update(stats)
+    
+    # Counters are per process: under gunicorn each request reports one worker's numbers
+    return {
+        'pid': os.getpid(),
+        'callbacks': callbacks,
+        'total': {
+            'requests': totals['requests'],
+            'computed': totals['computed'],
+            'coalesced': totals['coalesced'],
+            'coalesced_ratio': totals['coalesced'] / totals['requests'] if totals['requests'] else 0.0
+        }
+    }
+
 # Initialize the Dash app with custom CSS for Helvetica font
 app = Dash(
     __name__, 
@@ -26,6 +272,9 @@ app = Dash(
     ]
 )
 
+# Flask server used by gunicorn (gunicorn dashboard:server)
+server = app.server
+
 # Define theme colors as specified
 theme_colors = {
     'primary': '#296eb4',    # Primary blue 
@@ -72,14 +321,42 @@ app.index_string = '''
 </html>
 '''
 
-# Read the cleaned Excel file
-df = pd.read_excel("Regional Focussed Skill Training - Data (Cleaned).xlsx", sheet_name="Main")
+# Read the cleaned Excel file (DASHBOARD_DATA_FILE can point to another Excel or CSV file)
+data_file = os.environ.get('DASHBOARD_DATA_FILE', "Regional Focussed Skill Training - Data (Cleaned).xlsx")
 
-# Get unique regions and skills
-regions = df['Your Settlement/Location (Zone Wise)'].dropna().unique()
-technical_skills = list(set(extract_all_skills(df['Which Skill would you like to learn?'])))
-soft_skills = list(set(extract_all_skills(df['Which Soft Skill Would You like to learn?'])))
-all_skills = list(set(extract_all_skills(df['Training Needs'])))
+# DASHBOARD_BACKEND=sqlite queries an embedded SQLite database instead of
+# keeping the whole survey in memory (built once from the data file if missing)
+storage_backend = os.environ.get('DASHBOARD_BACKEND', 'pandas')
+
+if storage_backend not in ('pandas', 'sqlite'):
+    raise ValueError(f"Unknown DASHBOARD_BACKEND {storage_backend!r} (expected 'pandas' or 'sqlite')")
+
+if storage_backend == 'sqlite':
+    # Only needed (and only imported) for the SQLite backend
+    from storage import SurveyStore, ensure_database
+    
+    db_file = os.environ.get('DASHBOARD_DB_FILE', os.path.splitext(data_file)[0] + '.sqlite')
+    ensure_database([data_file], db_file)
+    store = SurveyStore(db_file)
+else:
+    if data_file.endswith('.csv'):
+        store = DataFrameStore(pd.read_csv(data_file))
+    else:
+        store = DataFrameStore(pd.read_excel(data_file, sheet_name="Main"))
+
+# Get unique regions, age groups and skills
+regions = store.distinct('region')
+age_groups = store.distinct('age_group')
+technical_skills = store.distinct_skills('technical')
+soft_skills = store.distinct_skills('soft')
+all_skills = store.distinct_skills('all')
+
+# The SQLite backend pages, sorts and filters the trainee table on the server
+if storage_backend == 'sqlite':
+    trainee_table_actions = {'page_action': 'custom', 'page_current': 0, 'sort_action': 'custom',
+                             'filter_action': 'custom', 'filter_query': ''}
+else:
+    trainee_table_actions = {'filter_action': 'native', 'sort_action': 'native'}
 
 # App layout
 app.layout = html.Div([
@@ -125,7 +402,7 @@ app.layout = html.Div([
                     html.P("Age Group:", style={'font-weight': 'bold', 'margin-bottom': '5px'}),
                     dcc.Dropdown(
                         id='age-selector',
-                        options=[{'label': age, 'value': age} for age in df['Age Group'].dropna().unique()] + [{'label': 'All Ages', 'value': 'all'}],
+                        options=[{'label': age, 'value': age} for age in age_groups] + [{'label': 'All Ages', 'value': 'all'}],
                         value='all',
                         style={'width': '100%'}
                     ),
@@ -203,6 +480,20 @@ app.layout = html.Div([
                 ])
             ]),
             
+            dcc.Tab(label='Skill Co-occurrence', children=[
+                html.Div([
+                    html.Div([
+                        html.H3("Training Needs Requested Together", style={'textAlign': 'center', 'color': theme_colors['primary']}),
+                        dcc.Graph(id='cooccurrence-pairs')
+                    ], style={'width': '100%', 'margin-bottom': '20px'}),
+                    
+                    html.Div([
+                        html.H3("Co-occurrence of Top Training Needs", style={'textAlign': 'center', 'color': theme_colors['primary']}),
+                        dcc.Graph(id='cooccurrence-heatmap')
+                    ], style={'width': '100%'})
+                ])
+            ]),
+            
             dcc.Tab(label='Trainee Details', children=[
                 html.Div([
                     html.H3("Trainee Database", style={'textAlign': 'center', 'color': theme_colors['primary']}),
@@ -245,8 +536,7 @@ app.layout = html.Div([
                             }
                         ],
                         page_size=10,
-                        filter_action="native",
-                        sort_action="native"
+                        **trainee_table_actions
                     )
                 ])
             ])
@@ -270,22 +560,17 @@ app.layout = html.Div([
     [Input('region-selector', 'value'),
      Input('age-selector', 'value')]
 )
+@single_flight
 def update_gender_pie(selected_region, selected_age):
-    filtered_df = df.copy()
-    
-    # Apply filters
-    if selected_region != 'all':
-        filtered_df = filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == selected_region]
-    
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
+    filters = {'region': selected_region, 'age_group': selected_age}
     
     # Check if there are any data after filtering
-    if filtered_df.empty:
+    if store.count_respondents(filters) == 0:
         return px.pie(title="No data available for the selected filters")
     
+    gender_counts = store.count_by('gender', filters)
+    
     # Create gender pie chart
-    gender_counts = filtered_df['Gender'].value_counts()
     fig = px.pie(
         names=gender_counts.index,
         values=gender_counts.values,
@@ -307,22 +592,17 @@ def update_gender_pie(selected_region, selected_age):
     [Input('gender-selector', 'value'),
      Input('age-selector', 'value')]
 )
+@single_flight
 def update_region_pie(selected_gender, selected_age):
-    filtered_df = df.copy()
-    
-    # Apply filters
-    if selected_gender != 'all':
-        filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
-    
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
+    filters = {'gender': selected_gender, 'age_group': selected_age}
     
     # Check if there are any data after filtering
-    if filtered_df.empty:
+    if store.count_respondents(filters) == 0:
         return px.pie(title="No data available for the selected filters")
     
+    region_counts = store.count_by('region', filters)
+    
     # Create region pie chart
-    region_counts = filtered_df['Your Settlement/Location (Zone Wise)'].value_counts()
     fig = px.pie(
         names=region_counts.index,
         values=region_counts.values,
@@ -346,43 +626,28 @@ def update_region_pie(selected_gender, selected_age):
      Input('age-selector', 'value'),
      Input('skill-type-selector', 'value')]
 )
+@single_flight
 def update_top_skills_bar(selected_region, selected_gender, selected_age, skill_type):
-    filtered_df = df.copy()
-    
-    # Apply filters
-    if selected_region != 'all':
-        filtered_df = filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == selected_region]
-    
-    if selected_gender != 'all':
-        filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
-    
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
-    
-    # Check if there are any data after filtering
-    if filtered_df.empty:
-        return px.bar(title="No data available for the selected filters")
-    
-    # Extract skills based on selected skill type
     if skill_type == 'technical':
-        skills = extract_all_skills(filtered_df['Which Skill would you like to learn?'])
         title = "Top Technical Skills"
     elif skill_type == 'soft':
-        skills = extract_all_skills(filtered_df['Which Soft Skill Would You like to learn?'])
         title = "Top Soft Skills"
     else:
-        skills = extract_all_skills(filtered_df['Training Needs'])
         title = "Top Overall Training Needs"
     
+    filters = {'region': selected_region, 'gender': selected_gender, 'age_group': selected_age}
+    
+    # Check if there are any data after filtering
+    if store.count_respondents(filters) == 0:
+        return px.bar(title="No data available for the selected filters")
+    
     # Count skills and get top 10 (or fewer if there aren't 10)
-    skill_counts = Counter(skills)
+    top_skills = store.top_skills(skill_type, filters, 10)
     
     # Check if there are any skills after filtering
-    if not skill_counts:
+    if top_skills.empty:
         return px.bar(title=f"No {title.lower()} available for the selected filters")
     
-    top_skills = pd.DataFrame(skill_counts.most_common(10), columns=['Skill', 'Count'])
-    
     # Create bar chart
     fig = px.bar(
         top_skills,
@@ -409,18 +674,12 @@ def update_top_skills_bar(selected_region, selected_gender, selected_age, skill_
      Input('gender-selector', 'value'),
      Input('age-selector', 'value')]
 )
+@single_flight
 def update_regional_skill_bar(selected_skill, selected_gender, selected_age):
-    filtered_df = df.copy()
-    
-    # Apply filters
-    if selected_gender != 'all':
-        filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
-    
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
+    filters = {'gender': selected_gender, 'age_group': selected_age}
     
     # Check if there are any data after filtering
-    if filtered_df.empty:
+    if store.count_respondents(filters) == 0:
         return px.bar(title="No data available for the selected filters")
     
     # Check if a skill is selected
@@ -428,30 +687,13 @@ def update_regional_skill_bar(selected_skill, selected_gender, selected_age):
         return px.bar(title="Please select a skill to view its regional distribution")
     
     # Calculate regional distribution for selected skill
-    region_data = []
-    
-    for region in regions:
-        region_df = filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == region]
-        region_total = len(region_df)
-        
-        if region_total > 0:
-            region_skills = extract_all_skills(region_df['Training Needs'])
-            skill_count = sum(1 for skill in region_skills if skill == selected_skill)
-            skill_percent = (skill_count / region_total) * 100
-            
-            region_data.append({
-                'Region': region,
-                'Count': skill_count,
-                'Percentage': skill_percent,
-                'Total Respondents': region_total
-            })
+    region_data_df = store.skill_count_by_region(selected_skill, filters)
+    region_data_df['Percentage'] = region_data_df['Count'] / region_data_df['Total Respondents'] * 100
     
     # Check if there's any data for the selected skill
-    if not region_data:
+    if region_data_df.empty:
         return px.bar(title=f"No data for '{selected_skill}' in any region")
     
-    region_data_df = pd.DataFrame(region_data)
-    
     # Create bar chart
     fig = px.bar(
         region_data_df,
@@ -481,79 +723,27 @@ def update_regional_skill_bar(selected_skill, selected_gender, selected_age):
      Input('age-selector', 'value'),
      Input('skill-type-selector', 'value')]
 )
+@single_flight
 def update_regional_top_skills(selected_region, selected_gender, selected_age, skill_type):
-    filtered_df = df.copy()
-    
-    # Apply gender and age filters
-    if selected_gender != 'all':
-        filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
-    
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
+    filters = {'gender': selected_gender, 'age_group': selected_age}
     
     # Check if there are any data after filtering
-    if filtered_df.empty:
+    if store.count_respondents(filters) == 0:
         return px.bar(title="No data available for the selected filters")
     
-    # Decide which regions to include
-    if selected_region != 'all':
-        regions_to_include = [selected_region]
-    else:
-        # Only include regions with more than 3 respondents
-        regions_to_include = [region for region in regions 
-                            if len(filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == region]) > 3]
-    
-    # Check if there are any regions to analyze
-    if not regions_to_include:
+    # Only include regions with more than 3 respondents unless a region is selected
+    if selected_region == 'all' and not (store.count_by('region', filters) > 3).any():
         return px.bar(title="No regions with enough respondents for the selected filters")
     
-    # Prepare data for chart
-    chart_data = []
-    
-    for region in regions_to_include:
-        region_df = filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == region]
-        region_total = len(region_df)
-        
-        if region_total == 0:
-            continue
-        
-        # Extract skills based on selected skill type
-        if skill_type == 'technical':
-            region_skills = extract_all_skills(region_df['Which Skill would you like to learn?'])
-            if not region_skills:
-                continue
-        elif skill_type == 'soft':
-            region_skills = extract_all_skills(region_df['Which Soft Skill Would You like to learn?'])
-            if not region_skills:
-                continue
-        else:
-            region_skills = extract_all_skills(region_df['Training Needs'])
-            if not region_skills:
-                continue
-        
-        # Get top 5 skills for this region
-        skill_counts = Counter(region_skills)
-        if not skill_counts:
-            continue
-            
-        top_skills = skill_counts.most_common(5)
-        
-        for skill, count in top_skills:
-            percentage = (count / region_total) * 100
-            chart_data.append({
-                'Region': region,
-                'Skill': skill,
-                'Count': count,
-                'Percentage': percentage,
-                'Total Respondents': region_total
-            })
+    # Get top 5 skills for each region
+    chart_df = store.top_skills_by_region(skill_type, dict(filters, region=selected_region), 5,
+                                          min_respondents=4 if selected_region == 'all' else 1)
+    chart_df['Percentage'] = chart_df['Count'] / chart_df['Total Respondents'] * 100
     
     # Check if there's any data to display
-    if not chart_data:
+    if chart_df.empty:
         return px.bar(title=f"No data available for the selected skill type and filters")
     
-    chart_df = pd.DataFrame(chart_data)
-    
     # Create grouped bar chart
     fig = px.bar(
         chart_df,
@@ -584,59 +774,42 @@ def update_regional_top_skills(selected_region, selected_gender, selected_age, s
      Input('age-selector', 'value'),
      Input('skill-type-selector', 'value')]
 )
+@single_flight
 def update_gender_skills_comparison(selected_region, selected_age, skill_type):
-    filtered_df = df.copy()
-    
-    # Apply filters
-    if selected_region != 'all':
-        filtered_df = filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == selected_region]
+    if skill_type == 'technical':
+        title = "Gender Comparison of Technical Skills"
+    elif skill_type == 'soft':
+        title = "Gender Comparison of Soft Skills"
+    else:
+        title = "Gender Comparison of Overall Training Needs"
     
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
+    filters = {'region': selected_region, 'age_group': selected_age}
     
     # Check if there are any data after filtering
-    if filtered_df.empty:
+    if store.count_respondents(filters) == 0:
         return px.bar(title="No data available for the selected filters")
     
-    # Split by gender
-    male_df = filtered_df[filtered_df['Gender'] == 'Male']
-    female_df = filtered_df[filtered_df['Gender'] == 'Female']
-    
     # Check if there are data for both genders
-    if male_df.empty or female_df.empty:
+    gender_counts = store.count_by('gender', filters)
+    male_total = gender_counts.get('Male', 0)
+    female_total = gender_counts.get('Female', 0)
+    if not male_total or not female_total:
         return px.bar(title="Insufficient data for gender comparison with the selected filters")
     
-    # Extract skills based on selected skill type
-    if skill_type == 'technical':
-        male_skills = extract_all_skills(male_df['Which Skill would you like to learn?'])
-        female_skills = extract_all_skills(female_df['Which Skill would you like to learn?'])
-        title = "Gender Comparison of Technical Skills"
-    elif skill_type == 'soft':
-        male_skills = extract_all_skills(male_df['Which Soft Skill Would You like to learn?'])
-        female_skills = extract_all_skills(female_df['Which Soft Skill Would You like to learn?'])
-        title = "Gender Comparison of Soft Skills"
-    else:
-        male_skills = extract_all_skills(male_df['Training Needs'])
-        female_skills = extract_all_skills(female_df['Training Needs'])
-        title = "Gender Comparison of Overall Training Needs"
+    # Count skills for each gender
+    counts = store.skill_counts_by_gender(skill_type, filters)
+    male_counts = dict(counts.loc[counts['Gender'] == 'Male', ['Skill', 'Count']].itertuples(index=False))
+    female_counts = dict(counts.loc[counts['Gender'] == 'Female', ['Skill', 'Count']].itertuples(index=False))
     
     # Check if there are skills for both genders
-    if not male_skills or not female_skills:
+    if not male_counts or not female_counts:
         return px.bar(title=f"Insufficient {skill_type} skills data for gender comparison")
     
-    # Get top skills for each gender
-    male_counts = Counter(male_skills)
-    female_counts = Counter(female_skills)
-    
-    # Get the top 7 skills overall to compare
-    all_skills = male_skills + female_skills
-    all_skills_counter = Counter(all_skills)
-    
-    # Check if there are any skills to display
-    if not all_skills_counter:
-        return px.bar(title=f"No skills data available for the selected filters")
-    
-    top_skills = [skill for skill, _ in all_skills_counter.most_common(7)]
+    # Get the top 7 skills overall to compare. Ties go in order of first mention
+    # in the male mentions followed by the female ones, like the pandas path.
+    counts['first_seen'] += (counts['Gender'] == 'Female') * (counts['first_seen'].max() + 1)
+    totals = counts.groupby('Skill').agg(Count=('Count', 'sum'), first_seen=('first_seen', 'min'))
+    top_skills = list(totals.sort_values(['Count', 'first_seen'], ascending=[False, True]).index[:7])
     
     # Calculate percentages
     chart_data = []
@@ -645,8 +818,8 @@ def update_gender_skills_comparison(selected_region, selected_age, skill_type):
         male_count = male_counts.get(skill, 0)
         female_count = female_counts.get(skill, 0)
         
-        male_pct = (male_count / len(male_df)) * 100 if len(male_df) > 0 else 0
-        female_pct = (female_count / len(female_df)) * 100 if len(female_df) > 0 else 0
+        male_pct = (male_count / male_total) * 100 if male_total > 0 else 0
+        female_pct = (female_count / female_total) * 100 if female_total > 0 else 0
         
         chart_data.append({
             'Skill': skill,
@@ -687,45 +860,145 @@ def update_gender_skills_comparison(selected_region, selected_age, skill_type):
     
     return fig
 
-# Define callback to update trainee table
+# Define callback to update skill co-occurrence charts
 @app.callback(
-    Output('trainee-table', 'data'),
+    [Output('cooccurrence-pairs', 'figure'),
+     Output('cooccurrence-heatmap', 'figure')],
     [Input('region-selector', 'value'),
      Input('gender-selector', 'value'),
-     Input('age-selector', 'value'),
-     Input('skill-selector', 'value')]
+     Input('age-selector', 'value')]
 )
-def update_trainee_table(selected_region, selected_gender, selected_age, selected_skill):
-    filtered_df = df.copy()
+@single_flight
+def update_skill_cooccurrence(selected_region, selected_gender, selected_age):
+    filters = {'region': selected_region, 'gender': selected_gender, 'age_group': selected_age}
     
-    # Apply filters
-    if selected_region != 'all':
-        filtered_df = filtered_df[filtered_df['Your Settlement/Location (Zone Wise)'] == selected_region]
+    # Check if there are any data after filtering
+    if store.count_respondents(filters) == 0:
+        no_data = px.bar(title="No data available for the selected filters")
+        return no_data, no_data
+    
+    # Skill x skill co-occurrence counts for the filtered respondents
+    cooccurrence, respondents, matrix_names = store.skill_cooccurrence(filters)
+    
+    skill_totals = cooccurrence.diagonal()
+    
+    # Each pair once (upper triangle without the diagonal)
+    pairs = sparse.triu(cooccurrence, k=1).tocoo()
+    
+    # Check if any respondents asked for more than one skill
+    if pairs.nnz == 0:
+        no_data = px.bar(title="No training needs requested together for the selected filters")
+        return no_data, no_data
+    
+    # Get top 15 pairs (or fewer if there aren't 15), ties broken by name as skills are coded alphabetically
+    top_n = min(15, pairs.nnz)
+    threshold = np.partition(pairs.data, pairs.nnz - top_n)[pairs.nnz - top_n]
+    candidates = np.flatnonzero(pairs.data >= threshold)
+    top = candidates[np.lexsort((pairs.col[candidates], pairs.row[candidates], -pairs.data[candidates]))][:top_n]
+    
+    pairs_df = pd.DataFrame({
+        'Pair': [f"{matrix_names[i]} + {matrix_names[j]}" for i, j in zip(pairs.row[top], pairs.col[top])],
+        'Count': pairs.data[top],
+        'Percentage': pairs.data[top] / respondents * 100
+    })
+    
+    # Create bar chart of top pairs
+    pairs_fig = px.bar(
+        pairs_df,
+        x='Count',
+        y='Pair',
+        orientation='h',
+        title="Top Skill Pairs",
+        color='Count',
+        hover_data=['Percentage'],
+        color_continuous_scale=[[0, theme_colors['primary']], [1, theme_colors['secondary']]]
+    )
     
-    if selected_gender != 'all':
-        filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
+    pairs_fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        xaxis_title="Respondents Requesting Both",
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=600
+    )
     
-    if selected_age != 'all':
-        filtered_df = filtered_df[filtered_df['Age Group'] == selected_age]
+    # Heatmap of the 15 most requested skills
+    top_n = min(15, np.count_nonzero(skill_totals))
+    top_skills = np.argsort(-skill_totals, kind='stable')[:top_n]
+    heatmap = cooccurrence[top_skills][:, top_skills].toarray().astype(float)
+    np.fill_diagonal(heatmap, np.nan)  # Leave out each skill's own total
+    top_skill_names = list(matrix_names[top_skills])
+    
+    heatmap_fig = px.imshow(
+        heatmap,
+        x=top_skill_names,
+        y=top_skill_names,
+        title="Respondents Requesting Both Skills",
+        labels={'color': 'Count'},
+        color_continuous_scale=[[0, theme_colors['white']], [1, theme_colors['primary']]]
+    )
+    
+    heatmap_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=700,
+        xaxis={'tickangle': -45}
+    )
     
-    # Filter by selected skill if applicable
-    if selected_skill:
-        # We need to find trainees who have the selected skill in their training needs
-        skill_matches = []
+    return pairs_fig, heatmap_fig
+
+# Define callback to update trainee table
+if storage_backend == 'sqlite':
+    # With the SQLite backend only the current page is fetched from the database
+    @single_flight
+    def query_trainee_page(selected_region, selected_gender, selected_age, selected_skill,
+                           page_current, sort_by, filter_query, page_size):
+        filters = {'region': selected_region, 'gender': selected_gender, 'age_group': selected_age}
+        records, total = store.trainees(filters, selected_skill, page_current * page_size, page_size,
+                                        sort_by, filter_query)
+        return records.to_dict('records'), max(1, -(-total // page_size))
+    
+    @app.callback(
+        [Output('trainee-table', 'data'),
+         Output('trainee-table', 'page_count'),
+         Output('trainee-table', 'page_current')],
+        [Input('region-selector', 'value'),
+         Input('gender-selector', 'value'),
+         Input('age-selector', 'value'),
+         Input('skill-selector', 'value'),
+         Input('trainee-table', 'page_current'),
+         Input('trainee-table', 'sort_by'),
+         Input('trainee-table', 'filter_query')],
+        [State('trainee-table', 'page_size')]
+    )
+    def update_trainee_table(selected_region, selected_gender, selected_age, selected_skill,
+                             page_current, sort_by, filter_query, page_size):
+        # Go back to the first page unless only the page changed (filters or sorting changed)
+        if 'trainee-table.page_current' not in ctx.triggered_prop_ids or not page_current:
+            page_current = 0
         
-        for idx, row in filtered_df.iterrows():
-            training_needs = row['Training Needs']
-            if pd.isna(training_needs):
-                continue
-                
-            skills = [skill.strip() for skill in re.split(r',\s*|;\s*', training_needs)]
-            if selected_skill in skills:
-                skill_matches.append(idx)
+        # Return data for table
+        data, page_count = query_trainee_page(selected_region, selected_gender, selected_age, selected_skill,
+                                              page_current, sort_by, filter_query, page_size)
+        return data, page_count, page_current
+else:
+    @app.callback(
+        Output('trainee-table', 'data'),
+        [Input('region-selector', 'value'),
+         Input('gender-selector', 'value'),
+         Input('age-selector', 'value'),
+         Input('skill-selector', 'value')]
+    )
+    @single_flight
+    def update_trainee_table(selected_region, selected_gender, selected_age, selected_skill):
+        filters = {'region': selected_region, 'gender': selected_gender, 'age_group': selected_age}
+        records, total = store.trainees(filters, selected_skill)
         
-        filtered_df = filtered_df.loc[skill_matches] if skill_matches else pd.DataFrame(columns=filtered_df.columns)
-    
-    # Return data for table
-    return filtered_df.to_dict('records')
+        # Return data for table
+        return records.to_dict('records')
+
+# Expose the single-flight counters to see how much work was deduplicated
+@app.server.route('/_single-flight-stats')
+def single_flight_stats_view():
+    return jsonify(get_single_flight_stats())
 
 # Run the app
 if __name__ == '__main__':
@@ -0,0 +1,383 @@
+"""Concurrent load test for the dashboard's Dash HTTP endpoints.
+
+Starts gunicorn locally on synthetic survey data for each worker/thread
+configuration, replays interaction sequences from many simulated users as
+POSTs to /_dash-update-component and reports throughput, latency percentiles
+and error rates.
+
+Example:
+    python load_test.py --rows 20000 --users 50 --sessions 5 --configs 1x1,2x4,4x8
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from storage import build_database
+
+# Synthetic survey values (same columns as the cleaned Excel file)
+REGIONS = ['North Zone', 'South Zone', 'East Zone', 'West Zone', 'Central Zone', 'Hill Zone']
+GENDERS = ['Male', 'Female']
+AGE_GROUPS = ['18-25', '26-35', '36-45', '46-60']
+EDUCATION = ['Class 10', 'Class 12', 'Graduate', 'Post Graduate']
+STATUS = ['Student', 'Employed', 'Unemployed', 'Self-employed']
+TECHNICAL_SKILLS = ['Computer Basics', 'Data Entry', 'Tailoring', 'Plumbing', 'Electrical Wiring',
+                    'Driving', 'Graphic Design', 'Web Development', 'Accounting', 'Beauty & Wellness',
+                    'Mobile Repair', 'Cooking', 'Carpentry', 'Photography', 'Digital Marketing']
+SOFT_SKILLS = ['Communication', 'Leadership', 'Teamwork', 'Time Management', 'Public Speaking',
+               'Problem Solving', 'English Speaking', 'Interview Skills']
+
+# Relative weights of the interaction steps in a session. Tab contents are
+# pre-rendered dcc.Tab children, so switching tabs sends no request and is not
+# simulated. Table steps are only replayed when the table pages on the server.
+STEP_WEIGHTS = {'dropdown': 5, 'table': 2}
+
+# Endpoint of the callback POSTs, reported apart from the page load GETs
+CALLBACK_PATH = '/_dash-update-component'
+
+
+# Function to write a synthetic survey CSV with the given number of respondents
+def generate_synthetic_data(path, rows, seed=0):
+    rng = random.Random(seed)
+    records = []
+
+    for i in range(rows):
+        technical = rng.sample(TECHNICAL_SKILLS, rng.randint(1, 3))
+        soft = rng.sample(SOFT_SKILLS, rng.randint(1, 2))
+        records.append({
+            'Name': f'Trainee {i}',
+            'Gender': rng.choice(GENDERS),
+            'Phone No.': f'98{rng.randint(10000000, 99999999)}',
+            'Email': f'trainee{i}@example.com',
+            'Age Group': rng.choice(AGE_GROUPS),
+            'Your Settlement/Location (Zone Wise)': rng.choice(REGIONS),
+            'Highest Education Qualification': rng.choice(EDUCATION),
+            'Current Status': rng.choice(STATUS),
+            'Which Skill would you like to learn?': ', '.join(technical),
+            'Which Soft Skill Would You like to learn?': ', '.join(soft),
+            'Training Needs': ', '.join(technical + soft)
+        })
+
+    pd.DataFrame(records).to_csv(path, index=False)
+
+
+# Function to find a free local port for the server
+def find_free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+# Function to start gunicorn with the given worker/thread configuration
+def start_server(data_file, db_file, backend, host, port, workers, threads):
+    env = dict(os.environ, DASHBOARD_DATA_FILE=data_file, DASHBOARD_BACKEND=backend, DASHBOARD_DB_FILE=db_file)
+    command = [
+        sys.executable, '-m', 'gunicorn', 'dashboard:server',
+        '--bind', f'{host}:{port}',
+        '--workers', str(workers),
+        '--threads', str(threads),
+        '--timeout', '120',
+        '--log-level', 'warning'
+    ]
+    return subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+# Function to wait until the server answers or give up
+def wait_for_server(base_url, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f'{base_url}/_dash-layout', timeout=5) as response:
+                return json.loads(response.read())
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.5)
+    raise RuntimeError(f"Server did not start within {timeout} seconds")
+
+
+# Function to stop the server
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# Function to collect initial property values of the components and options of the input components
+def collect_inputs(layout):
+    values = {}
+    options = {}
+    stack = [layout]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        props = node.get('props', {})
+        if 'id' in props:
+            for name, value in props.items():
+                if name != 'children':
+                    values[(props['id'], name)] = value
+        if 'id' in props and 'value' in props:
+            options[props['id']] = [
+                option['value'] if isinstance(option, dict) else option
+                for option in props.get('options') or []
+            ]
+        stack.append(props.get('children'))
+
+    return values, options
+
+
+# Function to split a callback output like "a.figure" or "..a.figure...b.figure.." into (id, property) pairs
+def parse_outputs(output):
+    if output.startswith('..'):
+        return [tuple(item.rsplit('.', 1)) for item in output[2:-2].split('...')]
+    return [tuple(output.rsplit('.', 1))]
+
+
+# Function to check whether the trainee table is paged by a server callback
+def has_server_paging(callbacks):
+    return any(
+        item['id'] == 'trainee-table' and item['property'] == 'page_current'
+        for callback in callbacks for item in callback['inputs']
+    )
+
+
+# Class to record request latencies and errors per path from all simulated users
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.error_samples = []
+
+    def add(self, path, latency, error=None):
+        with self.lock:
+            self.latencies[path].append(latency)
+            if error is not None:
+                self.errors[path] += 1
+                if len(self.error_samples) < 5:
+                    self.error_samples.append(error)
+
+
+# Class for one simulated user replaying interaction sequences
+class SimulatedUser:
+    def __init__(self, base_url, callbacks, values, options, results, seed, think_time):
+        self.base_url = base_url
+        self.callbacks = callbacks
+        self.values = dict(values)
+        self.options = options
+        self.results = results
+        self.rng = random.Random(seed)
+        self.think_time = think_time
+        self.table_callbacks = [
+            callback for callback in callbacks
+            if ('trainee-table', 'data') in parse_outputs(callback['output'])
+        ]
+        self.server_paging = has_server_paging(callbacks)
+
+    def request(self, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=data,
+            headers={'Content-Type': 'application/json'}
+        )
+
+        start = time.perf_counter()
+        error = None
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+        except urllib.error.HTTPError as exc:
+            # 204 means the callback prevented the update, which is not an error
+            if exc.code != 204:
+                error = f'{path}: HTTP {exc.code}'
+        except (http.client.HTTPException, OSError) as exc:
+            # Includes refused/reset connections, timeouts and truncated responses
+            error = f'{path}: {exc!r}'
+        self.results.add(path, time.perf_counter() - start, error)
+
+    def fire(self, callback, changed_prop):
+        outputs = [
+            {'id': component_id, 'property': component_property}
+            for component_id, component_property in parse_outputs(callback['output'])
+        ]
+        self.request(CALLBACK_PATH, {
+            'output': callback['output'],
+            'outputs': outputs if callback['output'].startswith('..') else outputs[0],
+            'inputs': [
+                {'id': item['id'], 'property': item['property'], 'value': self.values.get((item['id'], item['property']))}
+                for item in callback['inputs']
+            ],
+            'changedPropIds': [changed_prop] if changed_prop else [],
+            'state': [
+                {'id': item['id'], 'property': item['property'], 'value': self.values.get((item['id'], item['property']))}
+                for item in callback.get('state', [])
+            ]
+        })
+
+    def open_dashboard(self):
+        self.request('/')
+        self.request('/_dash-layout')
+        self.request('/_dash-dependencies')
+        for callback in self.callbacks:
+            self.fire(callback, None)
+
+    def change_dropdown(self):
+        component_id = self.rng.choice([key for key, choices in self.options.items() if choices])
+        self.values[(component_id, 'value')] = self.rng.choice(self.options[component_id])
+        for callback in self.callbacks:
+            if any(item['id'] == component_id for item in callback['inputs']):
+                self.fire(callback, f'{component_id}.value')
+
+    def page_table(self):
+        self.values[('trainee-table', 'page_current')] = self.rng.randrange(5)
+        for callback in self.table_callbacks:
+            self.fire(callback, 'trainee-table.page_current')
+
+    def run(self, sessions, steps):
+        actions = {'dropdown': self.change_dropdown, 'table': self.page_table}
+        weights = dict(STEP_WEIGHTS)
+        if not self.server_paging:
+            weights['table'] = 0
+        for _ in range(sessions):
+            self.open_dashboard()
+            for step in self.rng.choices(list(weights), weights=list(weights.values()), k=steps):
+                if self.think_time:
+                    time.sleep(self.rng.uniform(0, self.think_time))
+                actions[step]()
+
+
+# Function to run the simulated users against one server configuration
+def run_load(base_url, layout, args):
+    with urllib.request.urlopen(f'{base_url}/_dash-dependencies', timeout=30) as response:
+        callbacks = [callback for callback in json.loads(response.read())
+                     if not callback.get('clientside_function')]
+    values, options = collect_inputs(layout)
+    results = Results()
+
+    users = [
+        SimulatedUser(base_url, callbacks, values, options, results, args.seed + i, args.think_time)
+        for i in range(args.users)
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        for future in [executor.submit(user.run, args.sessions, args.steps) for user in users]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    # Callback POSTs first, then the page load GETs
+    paths = sorted(results.latencies, key=lambda path: (path != CALLBACK_PATH, path))
+    return {
+        'paths': {path: summarize(results.latencies[path], results.errors[path], elapsed) for path in paths},
+        'error_samples': results.error_samples,
+        'server_paging': has_server_paging(callbacks)
+    }
+
+
+# Function to compute throughput, latency percentiles and error rate of one path
+def summarize(latencies, errors, elapsed):
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'error_rate': errors / len(latencies) * 100 if len(latencies) else 0.0,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': np.percentile(latencies, 50) if len(latencies) else 0.0,
+        'p90': np.percentile(latencies, 90) if len(latencies) else 0.0,
+        'p99': np.percentile(latencies, 99) if len(latencies) else 0.0,
+        'max': latencies.max() if len(latencies) else 0.0
+    }
+
+
+# Function to parse configurations like "1x1,2x4" into (workers, threads) pairs
+def parse_configs(text):
+    configs = []
+    for item in text.split(','):
+        workers, threads = item.lower().split('x')
+        configs.append((int(workers), int(threads)))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard with concurrent simulated users.")
+    parser.add_argument('--rows', type=int, default=5000, help="synthetic respondents to generate")
+    parser.add_argument('--data-file', help="use an existing Excel/CSV file instead of synthetic data")
+    parser.add_argument('--users', type=int, default=20, help="concurrent simulated users")
+    parser.add_argument('--sessions', type=int, default=3, help="sessions per user")
+    parser.add_argument('--steps', type=int, default=10, help="interaction steps per session")
+    parser.add_argument('--think-time', type=float, default=0.0, help="max random pause between steps (seconds)")
+    parser.add_argument('--configs', default='1x1,2x4,4x4', help="gunicorn WORKERSxTHREADS list")
+    parser.add_argument('--backend', choices=['pandas', 'sqlite'], default='pandas', help="dashboard storage backend")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = args.data_file
+        if not data_file:
+            data_file = os.path.join(tmp_dir, 'synthetic_survey.csv')
+            print(f"Generating {args.rows} synthetic respondents...")
+            generate_synthetic_data(data_file, args.rows, args.seed)
+        data_file = os.path.abspath(data_file)
+
+        # Build the database once so the workers don't race to create it
+        db_file = os.path.join(tmp_dir, 'survey.sqlite')
+        if args.backend == 'sqlite':
+            print("Loading the survey into SQLite...")
+            build_database([data_file], db_file)
+
+        rows = []
+        for workers, threads in parse_configs(args.configs):
+            port = find_free_port(args.host)
+            base_url = f'http://{args.host}:{port}'
+            print(f"Running {args.users} users against {workers} worker(s) x {threads} thread(s) ({args.backend})...")
+
+            process = start_server(data_file, db_file, args.backend, args.host, port, workers, threads)
+            try:
+                layout = wait_for_server(base_url, process, args.startup_timeout)
+                result = run_load(base_url, layout, args)
+            finally:
+                stop_server(process)
+
+            if not result['server_paging']:
+                print("  trainee table pages in the browser, so no table paging requests were sent")
+            for sample in result['error_samples']:
+                print(f"  error: {sample}")
+            for path, summary in result['paths'].items():
+                rows.append({'Workers': workers, 'Threads': threads, 'Path': path, **summary})
+
+    print()
+    print(f"{'Workers':>7} {'Threads':>7} {'Path':<24} {'Requests':>8} {'Req/s':>8} {'p50 ms':>8} "
+          f"{'p90 ms':>8} {'p99 ms':>8} {'Max ms':>8} {'Errors':>6} {'Err %':>6}")
+    for row in rows:
+        print(f"{row['Workers']:>7} {row['Threads']:>7} {row['Path']:<24} {row['requests']:>8} {row['throughput']:>8.1f} "
+              f"{row['p50']:>8.1f} {row['p90']:>8.1f} {row['p99']:>8.1f} {row['max']:>8.1f} "
+              f"{row['errors']:>6} {row['error_rate']:>6.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,456 @@
+"""Embedded SQLite storage backend for survey datasets larger than memory.
+
+Responses and the exploded skill table are loaded once into a local SQLite
+database with indexes on region, gender, age group and skill, together with
+skill and skill pair counts per region, gender and age group. The dashboard
+then pushes filtering, counting and top-N queries down to the database
+instead of keeping the whole survey in a pandas DataFrame in every worker.
+
+Build a database from one or more survey files (e.g. one per year):
+    python storage.py survey_2024.csv survey_2025.csv --db survey.sqlite
+
+CSV files are streamed in chunks. Excel files can't be read in chunks and are
+loaded whole, so convert large surveys to CSV first.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Survey columns and their database names
+COLUMNS = {
+    'name': 'Name',
+    'gender': 'Gender',
+    'phone': 'Phone No.',
+    'email': 'Email',
+    'age_group': 'Age Group',
+    'region': 'Your Settlement/Location (Zone Wise)',
+    'education': 'Highest Education Qualification',
+    'status': 'Current Status',
+    'technical_skills': 'Which Skill would you like to learn?',
+    'soft_skills': 'Which Soft Skill Would You like to learn?',
+    'training_needs': 'Training Needs'
+}
+
+# Skill type (as in the dashboard's skill type selector) and its source column
+SKILL_COLUMNS = {
+    'technical': 'technical_skills',
+    'soft': 'soft_skills',
+    'all': 'training_needs'
+}
+
+# Function to map the dashboard's skill type selector to a stored skill type (anything else means all skills)
+def skill_type_key(skill_type):
+    return skill_type if skill_type in SKILL_COLUMNS else 'all'
+
+
+# Demographic filters the dashboard can push down
+FILTER_COLUMNS = ('region', 'gender', 'age_group')
+
+# Regions in order of first appearance in the whole survey, like the dashboard's region list
+REGION_ORDER = '(SELECT MIN(id) FROM responses WHERE region = r.region)'
+
+SCHEMA = '''
+CREATE TABLE responses (
+    id INTEGER PRIMARY KEY,
+    ''' + ',\n    '.join(f'{column} TEXT' for column in COLUMNS) + '''
+);
+CREATE TABLE skills (
+    respondent_id INTEGER NOT NULL,
+    skill_type TEXT NOT NULL,
+    skill TEXT NOT NULL
+);
+'''
+
+INDEXES = '''
+CREATE INDEX idx_responses_region ON responses (region);
+CREATE INDEX idx_responses_gender ON responses (gender);
+CREATE INDEX idx_responses_age_group ON responses (age_group);
+CREATE INDEX idx_skills_skill ON skills (skill_type, skill, respondent_id);
+CREATE INDEX idx_skills_respondent ON skills (respondent_id, skill_type);
+'''
+
+# Counts per combination of the demographic filters, computed once after loading.
+# Every dashboard filter is an equality test on region, gender and age group, so
+# charts add up a few thousand groups instead of scanning every skill mention.
+AGGREGATES = '''
+CREATE TABLE respondent_counts AS
+SELECT region, gender, age_group, COUNT(*) AS n, MIN(id) AS first_id,
+       SUM(id IN (SELECT respondent_id FROM skills WHERE skill_type = 'all' AND skill != '')) AS with_skills
+FROM responses
+GROUP BY region, gender, age_group;
+
+CREATE TABLE skill_counts AS
+SELECT r.region, r.gender, r.age_group, s.skill_type, s.skill, COUNT(*) AS n, MIN(s.rowid) AS first_seen
+FROM skills s JOIN responses r ON r.id = s.respondent_id
+GROUP BY r.region, r.gender, r.age_group, s.skill_type, s.skill;
+
+CREATE TABLE pair_counts AS
+WITH needs AS (SELECT DISTINCT respondent_id, skill FROM skills WHERE skill_type = 'all' AND skill != '')
+SELECT r.region, r.gender, r.age_group, a.skill AS skill_a, b.skill AS skill_b, COUNT(*) AS n
+FROM needs a
+JOIN needs b ON b.respondent_id = a.respondent_id AND b.skill >= a.skill
+JOIN responses r ON r.id = a.respondent_id
+GROUP BY r.region, r.gender, r.age_group, a.skill, b.skill;
+
+CREATE INDEX idx_skill_counts_skill ON skill_counts (skill_type, skill);
+'''
+
+
+# Function to read survey files in chunks so large CSVs never sit fully in memory
+# (Excel files are read whole)
+def read_survey_chunks(data_file, chunksize):
+    if data_file.endswith('.csv'):
+        yield from pd.read_csv(data_file, chunksize=chunksize, dtype=str)
+    else:
+        yield pd.read_excel(data_file, sheet_name="Main", dtype=str)
+
+
+# Function to load survey files into a new SQLite database
+def build_database(data_files, db_file, chunksize=100000):
+    # Build into a temporary file so concurrent workers never see a half-built database
+    tmp_file = f'{db_file}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    try:
+        build_tables(data_files, tmp_file, chunksize)
+    except BaseException:
+        # Don't leave a partial database behind when the build fails (bad file, disk full)
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    os.replace(tmp_file, db_file)
+
+
+# Function to load survey files into the tables of a new SQLite database file
+def build_tables(data_files, db_file, chunksize):
+    connection = sqlite3.connect(db_file)
+    try:
+        connection.executescript(SCHEMA)
+        next_id = 0
+
+        for data_file in data_files:
+            for chunk in read_survey_chunks(data_file, chunksize):
+                chunk = chunk.reindex(columns=list(COLUMNS.values()))
+                chunk.columns = list(COLUMNS)
+                chunk.index = pd.RangeIndex(next_id, next_id + len(chunk))
+                next_id += len(chunk)
+
+                responses = chunk.astype(object).where(chunk.notna(), None)
+                connection.executemany(
+                    f"INSERT INTO responses (id, {', '.join(COLUMNS)}) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                    responses.itertuples(name=None)
+                )
+
+                for skill_type, column in SKILL_COLUMNS.items():
+                    # Split like the dashboard's extract_all_skills (empty entries included)
+                    skills = chunk[column].str.split(r',\s*|;\s*').explode().dropna().str.strip()
+                    connection.executemany(
+                        "INSERT INTO skills (respondent_id, skill_type, skill) VALUES (?, ?, ?)",
+                        zip(skills.index.tolist(), [skill_type] * len(skills), skills.tolist())
+                    )
+                connection.commit()
+
+        connection.executescript(INDEXES)
+        # Gather statistics first: without them the planner self-joins the skills
+        # for pair_counts with a full scan per row
+        connection.execute("ANALYZE")
+        connection.executescript(AGGREGATES)
+        connection.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+
+
+# Function to build the database once when several workers start at the same time:
+# the first one builds it while the others wait on the lock and then reuse it
+def ensure_database(data_files, db_file):
+    if os.path.exists(db_file):
+        return
+    try:
+        import fcntl
+    except ImportError:
+        # No fcntl (Windows): build without the lock. Each build writes its own
+        # temporary file, so concurrent workers may repeat the work but never
+        # see a half-built database.
+        build_database(data_files, db_file)
+        return
+    with open(f'{db_file}.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(db_file):
+                build_database(data_files, db_file)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# Function to turn dashboard filter values into a WHERE clause ('all' means no filter)
+def where_clause(filters, alias='r'):
+    conditions = []
+    params = []
+    for column in FILTER_COLUMNS:
+        value = filters.get(column, 'all')
+        if value != 'all':
+            conditions.append(f'{alias}.{column} = ?')
+            params.append(value)
+    return (' AND '.join(conditions) or '1'), params
+
+
+# DataTable filter_query operators and their SQL comparison
+FILTER_OPERATORS = {
+    'eq': '=', '=': '=', 'ne': '!=', '!=': '!=',
+    'lt': '<', '<': '<', 'le': '<=', '<=': '<=',
+    'gt': '>', '>': '>', 'ge': '>=', '>=': '>='
+}
+
+FILTER_PART = re.compile(r'^\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s*(?P<value>.*)$')
+
+
+# Function to turn a DataTable filter_query (e.g. '{Name} icontains Ram && {Age Group} = 18-25')
+# into a parameterised WHERE clause. Parts that can't be parsed are ignored, as the
+# DataTable shows them as invalid and does not apply them either.
+def filter_query_clause(filter_query, alias='r'):
+    conditions = []
+    params = []
+    names = {label: column for column, label in COLUMNS.items()}
+
+    for part in (filter_query or '').split(' && '):
+        match = FILTER_PART.match(part.strip())
+        if not match or match['column'] not in names:
+            continue
+        column = f"{alias}.{names[match['column']]}"
+        operator = match['operator'].lower()
+        value = match['value'].strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1]
+
+        # 'i' and 's' prefixes select case-insensitive and case-sensitive matching
+        prefix = ''
+        if operator[0] in 'is' and (operator[1:] in FILTER_OPERATORS or operator[1:] == 'contains'):
+            prefix, operator = operator[0], operator[1:]
+        if prefix == 'i':
+            column, placeholder = f'lower({column})', 'lower(?)'
+        else:
+            placeholder = '?'
+
+        if operator == 'contains':
+            conditions.append(f'instr({column}, {placeholder}) > 0')
+            params.append(value)
+        elif operator == 'datestartswith':
+            conditions.append(f'instr({column}, ?) = 1')
+            params.append(value)
+        elif operator in FILTER_OPERATORS:
+            try:
+                params.append(float(value))
+                column = f'CAST({column} AS REAL)'
+                placeholder = '?'
+            except ValueError:
+                params.append(value)
+            conditions.append(f'{column} {FILTER_OPERATORS[operator]} {placeholder}')
+
+    return (' AND '.join(conditions) or '1'), params
+
+
+# Class to run the dashboard's queries against the SQLite database
+class SurveyStore:
+    def __init__(self, db_file, cache_size_kb=65536):
+        self.db_file = db_file
+        self.cache_size_kb = cache_size_kb
+        self.local = threading.local()
+        self.vocabulary = None
+
+    # One read-only connection per thread (sqlite3 connections are not shared across threads)
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f'file:{self.db_file}?mode=ro', uri=True)
+            connection.execute(f'PRAGMA cache_size = -{self.cache_size_kb}')
+            self.local.connection = connection
+        return connection
+
+    def query(self, sql, params=(), columns=None):
+        rows = self.connection().execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def distinct(self, column):
+        rows = self.connection().execute(
+            f"SELECT {column} FROM responses WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY MIN(id)"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def distinct_skills(self, skill_type):
+        rows = self.connection().execute(
+            "SELECT DISTINCT skill FROM skill_counts WHERE skill_type = ?", (skill_type_key(skill_type),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def count_respondents(self, filters):
+        where, params = where_clause(filters)
+        return self.connection().execute(
+            f"SELECT COALESCE(SUM(r.n), 0) FROM respondent_counts r WHERE {where}", params
+        ).fetchone()[0]
+
+    # Respondents per value of a column, like DataFrame.value_counts()
+    def count_by(self, column, filters):
+        where, params = where_clause(filters)
+        counts = self.query(
+            f"""SELECT r.{column}, SUM(r.n) AS n FROM respondent_counts r
+                WHERE {where} AND r.{column} IS NOT NULL
+                GROUP BY r.{column} ORDER BY n DESC, MIN(r.first_id)""",
+            params,
+            columns=['value', 'count']
+        )
+        return pd.Series(counts['count'].to_numpy(), index=counts['value'].to_numpy(), name='count')
+
+    # Most requested skills (ties in order of first mention, like Counter.most_common)
+    def top_skills(self, skill_type, filters, limit):
+        where, params = where_clause(filters)
+        return self.query(
+            f"""SELECT r.skill, SUM(r.n) AS n FROM skill_counts r
+                WHERE r.skill_type = ? AND {where}
+                GROUP BY r.skill ORDER BY n DESC, MIN(r.first_seen) LIMIT ?""",
+            [skill_type_key(skill_type)] + params + [limit],
+            columns=['Skill', 'Count']
+        )
+
+    # Mentions of one skill and respondents per region (regions in order of first appearance)
+    def skill_count_by_region(self, skill, filters):
+        where, params = where_clause(filters)
+        return self.query(
+            f"""WITH totals AS (
+                    SELECT r.region, SUM(r.n) AS total, {REGION_ORDER} AS first_id FROM respondent_counts r
+                    WHERE {where} AND r.region IS NOT NULL
+                    GROUP BY r.region
+                ),
+                mentions AS (
+                    SELECT r.region, SUM(r.n) AS n FROM skill_counts r
+                    WHERE r.skill_type = 'all' AND r.skill = ? AND {where}
+                    GROUP BY r.region
+                )
+                SELECT totals.region, COALESCE(mentions.n, 0), totals.total FROM totals
+                LEFT JOIN mentions ON mentions.region = totals.region
+                ORDER BY totals.first_id""",
+            params + [skill] + params,
+            columns=['Region', 'Count', 'Total Respondents']
+        )
+
+    # Top skills per region for regions with at least min_respondents respondents
+    def top_skills_by_region(self, skill_type, filters, limit, min_respondents):
+        where, params = where_clause(filters)
+        return self.query(
+            f"""WITH totals AS (
+                    SELECT r.region, SUM(r.n) AS total, {REGION_ORDER} AS first_id FROM respondent_counts r
+                    WHERE {where} AND r.region IS NOT NULL
+                    GROUP BY r.region HAVING SUM(r.n) >= ?
+                ),
+                counts AS (
+                    SELECT r.region, r.skill, SUM(r.n) AS n, MIN(r.first_seen) AS first_seen FROM skill_counts r
+                    WHERE r.skill_type = ? AND {where} AND r.region IN (SELECT region FROM totals)
+                    GROUP BY r.region, r.skill
+                ),
+                ranked AS (
+                    SELECT region, skill, n,
+                           ROW_NUMBER() OVER (PARTITION BY region ORDER BY n DESC, first_seen) AS rank
+                    FROM counts
+                )
+                SELECT ranked.region, ranked.skill, ranked.n, totals.total FROM ranked
+                JOIN totals ON totals.region = ranked.region
+                WHERE ranked.rank <= ?
+                ORDER BY totals.first_id, ranked.rank""",
+            params + [min_respondents, skill_type_key(skill_type)] + params + [limit],
+            columns=['Region', 'Skill', 'Count', 'Total Respondents']
+        )
+
+    # Skill mention counts per gender, with the first mention for stable ordering
+    def skill_counts_by_gender(self, skill_type, filters):
+        where, params = where_clause(filters)
+        return self.query(
+            f"""SELECT r.gender, r.skill, SUM(r.n) AS n, MIN(r.first_seen) AS first_seen FROM skill_counts r
+                WHERE r.skill_type = ? AND {where} AND r.gender IN ('Male', 'Female')
+                GROUP BY r.gender, r.skill""",
+            [skill_type_key(skill_type)] + params,
+            columns=['Gender', 'Skill', 'Count', 'first_seen']
+        )
+
+    # Alphabetical 'Training Needs' vocabulary (computed once; the database is read-only)
+    def skill_vocabulary(self):
+        if self.vocabulary is None:
+            rows = self.connection().execute(
+                "SELECT DISTINCT skill FROM skill_counts WHERE skill_type = 'all' AND skill != '' ORDER BY skill"
+            ).fetchall()
+            self.vocabulary = np.asarray([row[0] for row in rows])
+        return self.vocabulary
+
+    # Skill x skill co-occurrence counts of 'Training Needs' for the filtered respondents,
+    # added up from the pair counts precomputed per demographic group
+    def skill_cooccurrence(self, filters):
+        where, params = where_clause(filters)
+        skill_names = self.skill_vocabulary()
+        pairs = self.query(
+            f"""SELECT r.skill_a, r.skill_b, SUM(r.n) FROM pair_counts r
+                WHERE {where} GROUP BY r.skill_a, r.skill_b""",
+            params,
+            columns=['skill_a', 'skill_b', 'n']
+        )
+        respondents = self.connection().execute(
+            f"SELECT COALESCE(SUM(r.with_skills), 0) FROM respondent_counts r WHERE {where}", params
+        ).fetchone()[0]
+
+        # Each pair is stored once; mirror it to get the symmetric matrix
+        rows = pd.Categorical(pairs['skill_a'], categories=skill_names).codes
+        cols = pd.Categorical(pairs['skill_b'], categories=skill_names).codes
+        counts = pairs['n'].to_numpy(dtype=np.int32)
+        off_diagonal = rows != cols
+        cooccurrence = sparse.csr_matrix(
+            (np.concatenate([counts, counts[off_diagonal]]),
+             (np.concatenate([rows, cols[off_diagonal]]), np.concatenate([cols, rows[off_diagonal]]))),
+            shape=(len(skill_names), len(skill_names))
+        )
+        return cooccurrence, respondents, skill_names
+
+    # One page of trainee records plus the total number of matching trainees
+    def trainees(self, filters, skill, offset, limit, sort_by=None, filter_query=None):
+        where, params = where_clause(filters)
+        table_where, table_params = filter_query_clause(filter_query)
+        where += f' AND {table_where}'
+        params = params + table_params
+        if skill:
+            where += " AND r.id IN (SELECT respondent_id FROM skills WHERE skill_type = 'all' AND skill = ?)"
+            params = params + [skill]
+
+        order = 'r.id'
+        names = {label: column for column, label in COLUMNS.items()}
+        if sort_by and sort_by[0]['column_id'] in names:
+            direction = 'DESC' if sort_by[0]['direction'] == 'desc' else 'ASC'
+            order = f"r.{names[sort_by[0]['column_id']]} {direction}, r.id"
+
+        total = self.connection().execute(f"SELECT COUNT(*) FROM responses r WHERE {where}", params).fetchone()[0]
+        records = self.query(
+            f"SELECT {', '.join(f'r.{column}' for column in COLUMNS)} FROM responses r "
+            f"WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset],
+            columns=list(COLUMNS.values())
+        )
+        return records, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load survey files into the dashboard's SQLite database.")
+    parser.add_argument('data_files', nargs='+', help="CSV (streamed) or Excel (read whole) survey files")
+    parser.add_argument('--db', required=True, help="database file to create")
+    parser.add_argument('--chunksize', type=int, default=100000, help="CSV rows loaded per chunk")
+    args = parser.parse_args()
+
+    build_database(args.data_files, args.db, args.chunksize)
+    print(f"Loaded {', '.join(args.data_files)} into {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import importlib
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import generate_synthetic_data
+
+
+@pytest.fixture(scope='session')
+def data_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp('data') / 'survey.csv'
+    generate_synthetic_data(str(path), 3000, 1)
+
+    # Add respondents with repeated skills and empty entries, which both backends must count alike
+    survey = pd.read_csv(path)
+    extra = survey.head(3).copy()
+    extra['Training Needs'] = ['Driving, Driving; Communication', 'Leadership, ', 'Communication;Communication']
+    extra['Which Skill would you like to learn?'] = ['Driving, Driving', 'Cooking,', 'Tailoring']
+    pd.concat([survey, extra]).to_csv(path, index=False)
+    return str(path)
+
+
+# Fixture to import a fresh dashboard module on synthetic data with the given backend
+@pytest.fixture(scope='session')
+def load_dashboard(data_file, tmp_path_factory):
+    modules = {}
+
+    def load(backend='pandas'):
+        if backend not in modules:
+            os.environ['DASHBOARD_DATA_FILE'] = data_file
+            os.environ['DASHBOARD_BACKEND'] = backend
+            os.environ['DASHBOARD_DB_FILE'] = str(tmp_path_factory.mktemp('db') / 'survey.sqlite')
+            sys.modules.pop('dashboard', None)
+            modules[backend] = importlib.import_module('dashboard')
+        return modules[backend]
+
+    return load
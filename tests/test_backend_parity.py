@@ -0,0 +1,115 @@
+import importlib
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+REGIONS = ['all', 'North Zone', 'Hill Zone', 'Nowhere']
+GENDERS = ['all', 'Male', 'Female']
+AGES = ['all', '18-25', '26-35']
+SKILL_TYPES = ['all', 'technical', 'soft']
+SKILLS = [None, 'Driving', 'Communication', 'Leadership']
+
+# Every callback with a grid of filter values
+CASES = [
+    ('update_gender_pie', itertools.product(REGIONS, AGES)),
+    ('update_region_pie', itertools.product(GENDERS, AGES)),
+    ('update_top_skills_bar', itertools.product(REGIONS, GENDERS, AGES, SKILL_TYPES)),
+    ('update_regional_skill_bar', itertools.product(SKILLS, GENDERS, AGES)),
+    ('update_regional_top_skills', itertools.product(REGIONS, GENDERS, AGES, SKILL_TYPES)),
+    ('update_gender_skills_comparison', itertools.product(REGIONS, AGES, SKILL_TYPES)),
+    ('update_skill_cooccurrence', itertools.product(REGIONS, GENDERS, AGES)),
+]
+
+
+# Function to turn a callback result (figure or tuple of figures) into comparable JSON
+def as_json(result):
+    if isinstance(result, tuple):
+        return [as_json(item) for item in result]
+    return result.to_json()
+
+
+@pytest.mark.parametrize('name,args', [(name, args) for name, grid in CASES for args in grid])
+def test_callbacks_match_pandas_backend(load_dashboard, name, args):
+    pandas_dashboard = load_dashboard('pandas')
+    sqlite_dashboard = load_dashboard('sqlite')
+
+    expected = getattr(pandas_dashboard, name)(*args)
+    actual = getattr(sqlite_dashboard, name)(*args)
+    assert as_json(actual) == as_json(expected)
+
+
+@pytest.mark.parametrize('args', list(itertools.product(REGIONS, GENDERS, AGES, SKILLS)))
+def test_trainee_table_matches_pandas_backend(load_dashboard, args):
+    pandas_dashboard = load_dashboard('pandas')
+    sqlite_dashboard = load_dashboard('sqlite')
+
+    expected = [record['Name'] for record in pandas_dashboard.update_trainee_table(*args)]
+    pages = []
+    page_count = 1
+    page = 0
+    while page < page_count:
+        data, page_count = sqlite_dashboard.query_trainee_page(*args, page, None, '', 10)
+        pages.extend(record['Name'] for record in data)
+        page += 1
+    assert pages == expected
+
+
+def test_trainee_table_filter_query(load_dashboard):
+    sqlite_dashboard = load_dashboard('sqlite')
+    filter_query = '{Gender} = Female && {Name} icontains "trainee 1" && {Phone No.} > 9850000000'
+
+    expected = [
+        record['Name'] for record in load_dashboard('pandas').update_trainee_table('all', 'all', 'all', None)
+        if record['Gender'] == 'Female' and 'trainee 1' in record['Name'].lower()
+        and float(record['Phone No.']) > 9850000000
+    ]
+    data, page_count = sqlite_dashboard.query_trainee_page('all', 'all', 'all', None, 0, None, filter_query, 1000)
+    assert expected and [record['Name'] for record in data] == expected
+
+
+@pytest.mark.parametrize('changed,expected_page', [
+    ('trainee-table.page_current', 2),
+    ('trainee-table.sort_by', 0),
+    ('trainee-table.filter_query', 0),
+    ('region-selector.value', 0),
+])
+def test_trainee_table_page_resets_unless_paging(load_dashboard, changed, expected_page):
+    sqlite_dashboard = load_dashboard('sqlite')
+    values = {
+        'region-selector': 'all', 'gender-selector': 'all', 'age-selector': 'all', 'skill-selector': None,
+        'page_current': 2, 'sort_by': [{'column_id': 'Name', 'direction': 'desc'}], 'filter_query': ''
+    }
+    inputs = [{'id': component, 'property': 'value', 'value': values[component]}
+              for component in ('region-selector', 'gender-selector', 'age-selector', 'skill-selector')]
+    inputs += [{'id': 'trainee-table', 'property': prop, 'value': values[prop]}
+               for prop in ('page_current', 'sort_by', 'filter_query')]
+
+    response = sqlite_dashboard.app.server.test_client().post('/_dash-update-component', json={
+        'output': '..trainee-table.data...trainee-table.page_count...trainee-table.page_current..',
+        'outputs': [{'id': 'trainee-table', 'property': prop} for prop in ('data', 'page_count', 'page_current')],
+        'inputs': inputs,
+        'changedPropIds': [changed],
+        'state': [{'id': 'trainee-table', 'property': 'page_size', 'value': 10}]
+    })
+    assert response.status_code == 200
+    assert response.get_json()['response']['trainee-table']['page_current'] == expected_page
+
+
+def test_unknown_backend_is_rejected(data_file, monkeypatch):
+    monkeypatch.setenv('DASHBOARD_DATA_FILE', data_file)
+    monkeypatch.setenv('DASHBOARD_BACKEND', 'SQLite')
+    monkeypatch.delitem(sys.modules, 'dashboard', raising=False)
+    with pytest.raises(ValueError, match='SQLite'):
+        importlib.import_module('dashboard')
+    sys.modules.pop('dashboard', None)
+
+
+def test_pandas_backend_starts_without_fcntl(data_file):
+    # Simulate Windows, where fcntl does not exist
+    code = "import sys; sys.modules['fcntl'] = None; import dashboard; assert 'storage' not in sys.modules"
+    env = dict(os.environ, DASHBOARD_DATA_FILE=data_file, DASHBOARD_BACKEND='pandas')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', code], env=env, cwd=root, check=True)
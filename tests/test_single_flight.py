@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+
+
+# Function to call func from n threads at once, collecting results and errors
+def call_concurrently(func, n, *args):
+    results = [None] * n
+    errors = [None] * n
+
+    def run(i):
+        try:
+            results[i] = func(*args)
+        except BaseException as error:
+            errors[i] = error
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+# Function to wait until n - 1 callers are waiting on the leader
+def wait_for_followers(dashboard, name, n):
+    deadline = time.time() + 10
+    while dashboard.get_single_flight_stats()['callbacks'].get(name, {}).get('coalesced', 0) < n - 1:
+        assert time.time() < deadline, "followers never joined the in-flight call"
+        time.sleep(0.01)
+
+
+def test_concurrent_calls_share_one_computation(load_dashboard):
+    dashboard = load_dashboard()
+    release = threading.Event()
+    calls = []
+
+    @dashboard.single_flight
+    def sf_shared(region, skills):
+        calls.append(region)
+        release.wait()
+        return {'region': region}
+
+    threads, results, errors = call_concurrently(sf_shared, 8, 'North Zone', ['Driving'])
+    wait_for_followers(dashboard, 'sf_shared', 8)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['North Zone']
+    assert errors == [None] * 8
+    assert all(result is results[0] for result in results)
+    assert dashboard.get_single_flight_stats()['callbacks']['sf_shared'] == {
+        'requests': 8, 'computed': 1, 'coalesced': 7
+    }
+
+    # Once the call is finished the next one computes again
+    sf_shared('North Zone', ['Driving'])
+    assert len(calls) == 2
+
+
+def test_different_inputs_are_not_coalesced(load_dashboard):
+    dashboard = load_dashboard()
+    release = threading.Event()
+    started = threading.Semaphore(0)
+    calls = []
+
+    @dashboard.single_flight
+    def sf_distinct(value):
+        calls.append(value)
+        started.release()
+        release.wait()
+        return value
+
+    # The second call starts while the first is still blocked, so a key that
+    # ignored the inputs would make it wait for the first call's result
+    first, first_results, first_errors = call_concurrently(sf_distinct, 1, 'a')
+    try:
+        assert started.acquire(timeout=10)
+        second, second_results, second_errors = call_concurrently(sf_distinct, 1, 'b')
+        assert started.acquire(timeout=10), "second call was coalesced into the first"
+    finally:
+        release.set()
+    for thread in first + second:
+        thread.join()
+
+    assert sorted(calls) == ['a', 'b']
+    assert first_results + second_results == ['a', 'b']
+    assert first_errors + second_errors == [None, None]
+    assert dashboard.get_single_flight_stats()['callbacks']['sf_distinct'] == {
+        'requests': 2, 'computed': 2, 'coalesced': 0
+    }
+
+
+def test_leader_error_is_raised_in_every_caller(load_dashboard):
+    dashboard = load_dashboard()
+    release = threading.Event()
+
+    @dashboard.single_flight
+    def sf_failing():
+        release.wait()
+        raise ValueError("bad filters")
+
+    threads, results, errors = call_concurrently(sf_failing, 5)
+    wait_for_followers(dashboard, 'sf_failing', 5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    leader_errors = [error for error in errors if error.__cause__ is None]
+    assert len(leader_errors) == 1
+    # Each follower gets its own exception chained from the leader's
+    assert len({id(error) for error in errors}) == 5
+    assert all(error.__cause__ is leader_errors[0] for error in errors if error is not leader_errors[0])
+
+
+def test_leader_base_exception_does_not_return_none(load_dashboard):
+    dashboard = load_dashboard()
+    release = threading.Event()
+
+    @dashboard.single_flight
+    def sf_exiting():
+        release.wait()
+        raise SystemExit(1)
+
+    threads, results, errors = call_concurrently(sf_exiting, 3)
+    wait_for_followers(dashboard, 'sf_exiting', 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert sum(isinstance(error, SystemExit) for error in errors) == 1
+    assert sum(isinstance(error, RuntimeError) for error in errors) == 2
+    assert results == [None] * 3
+
+
+def test_stats_endpoint(load_dashboard):
+    dashboard = load_dashboard()
+    dashboard.update_gender_pie('all', 'all')
+
+    stats = dashboard.app.server.test_client().get('/_single-flight-stats').get_json()
+    assert stats['pid'] == os.getpid()
+    assert stats['callbacks']['update_gender_pie']['requests'] >= 1
+    assert stats['total']['requests'] == stats['total']['computed'] + stats['total']['coalesced']
+    assert 0 <= stats['total']['coalesced_ratio'] <= 1
+
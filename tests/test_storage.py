@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import storage
+
+
+def test_database_is_built_once_by_concurrent_workers(data_file, tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'survey.sqlite')
+    builds = []
+    build_database = storage.build_database
+
+    def slow_build(data_files, path):
+        builds.append(path)
+        time.sleep(0.2)
+        build_database(data_files, path)
+
+    monkeypatch.setattr(storage, 'build_database', slow_build)
+    threads = [threading.Thread(target=storage.ensure_database, args=([data_file], db_file)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builds == [db_file]
+    assert storage.SurveyStore(db_file).count_respondents({}) > 0
+
+
+def test_filter_query_clause():
+    where, params = storage.filter_query_clause('{Name} icontains "Ram" && {Age Group} = 18-25 && {Bogus} = 1')
+    assert where == 'instr(lower(r.name), lower(?)) > 0 AND r.age_group = ?'
+    assert params == ['Ram', '18-25']
+
+    where, params = storage.filter_query_clause('{Phone No.} >= 98')
+    assert where == 'CAST(r.phone AS REAL) >= ?'
+    assert params == [98.0]
+
+    assert storage.filter_query_clause('') == ('1', [])
+
+
+def test_database_is_built_without_fcntl(data_file, tmp_path, monkeypatch):
+    # Windows has no fcntl; the database is still built, just without the lock
+    monkeypatch.setitem(sys.modules, 'fcntl', None)
+    db_file = str(tmp_path / 'survey.sqlite')
+    storage.ensure_database([data_file], db_file)
+    assert storage.SurveyStore(db_file).count_respondents({}) > 0
+    assert not os.path.exists(f'{db_file}.lock')
+
+
+def test_failed_build_leaves_no_partial_database(data_file, tmp_path):
+    db_file = str(tmp_path / 'survey.sqlite')
+    with pytest.raises(FileNotFoundError):
+        storage.build_database([data_file, str(tmp_path / 'missing.csv')], db_file)
+    assert os.listdir(tmp_path) == []